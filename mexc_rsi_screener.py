@@ -1,24 +1,104 @@
 # -*- coding: utf-8 -*-
+import bisect
+import functools
 import requests
 import json
 import time
 import os
 import sys
+import threading
+import types
 import numpy as np
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
+from numpy.lib.stride_tricks import sliding_window_view
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 try:
     from plyer import notification
 except ImportError:
     notification = None  # Desktop notifications unavailable (e.g. on server)
+try:
+    import orjson
+except ImportError:
+    orjson = None  # C-accelerated JSON unavailable; fall back to stdlib json
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    # Numba unavailable (optional speed-up); run the decorated loops as plain Python
+    NUMBA_AVAILABLE = False
+    def njit(*args, **kwargs):
+        def decorator(func):
+            return func
+        return decorator
 
 # File paths
 CONFIG_FILE = 'config.json'
 DATA_FILE = 'market_data.json'
 
+# ANSI color codes for terminal output
+GREEN = "\033[92m"
+RED = "\033[91m"
+YELLOW = "\033[93m"
+CYAN = "\033[96m"
+GREY = "\033[90m"
+RESET = "\033[0m"
+
 # MEXC API URL
 BASE_URL = "https://contract.mexc.com"
 KLINE_ENDPOINT = "/api/v1/contract/kline/{symbol}"
 
+# Interval lookup tables, frozen so they can't be mutated by accident
+_INTERVAL_STR = types.MappingProxyType({
+    1: "Min1",
+    5: "Min5",
+    15: "Min15",
+    30: "Min30",
+    60: "Min60",
+    240: "Hour4",
+    480: "Hour8",
+    1440: "Day1",
+    10080: "Week1",
+    43200: "Month1",
+})
+_INTERVAL_SECONDS = types.MappingProxyType({
+    "Min1": 60, "Min5": 300, "Min15": 900, "Min30": 1800,
+    "Min60": 3600, "Hour4": 14400, "Hour8": 28800,
+    "Day1": 86400, "Week1": 604800, "Month1": 2592000,
+})
+
+# Shared HTTP session: keep-alive + pooled connections, so each kline call
+# reuses an open TLS connection instead of handshaking from scratch. The web
+# dashboard fetches through this module, so it shares the same pool.
+# Retries cover transient server errors and 429 rate-limit responses with
+# exponential backoff.
+SESSION = requests.Session()
+SESSION.headers.update({
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36"
+})
+SESSION.mount("https://", HTTPAdapter(
+    pool_connections=16,
+    pool_maxsize=32,
+    max_retries=Retry(total=3, backoff_factor=0.3,
+                      status_forcelist=[429, 500, 502, 503, 504])
+))
+
+# Request throttle shared across fetch threads.
+# MEXC allows 20 req / 2 s; spacing requests 100 ms apart keeps us safely under.
+MIN_REQUEST_INTERVAL = 0.1
+_throttle_lock = threading.Lock()
+_last_request_ts = 0.0
+
+def _throttle():
+    """Block until at least MIN_REQUEST_INTERVAL has passed since the last request."""
+    global _last_request_ts
+    with _throttle_lock:
+        wait = _last_request_ts + MIN_REQUEST_INTERVAL - time.monotonic()
+        if wait > 0:
+            time.sleep(wait)
+        _last_request_ts = time.monotonic()
+
 def send_notification(symbol, rsi_value, condition):
     """Send a Windows notification."""
     if notification is None:
@@ -33,26 +113,44 @@ def send_notification(symbol, rsi_value, condition):
     except Exception as e:
         print(f"[ERROR] Failed to send notification: {e}")
 
+# Parsed config cache keyed on the file's mtime, so the per-cycle reload
+# only re-reads and re-parses when config.json actually changed on disk.
+_config_cache = {"mtime": None, "config": None}
+
 def load_config():
-    """Load configuration from json file."""
-    if not os.path.exists(CONFIG_FILE):
+    """Load configuration from json file.
+    The parsed config is cached and reused until the file's mtime changes.
+    """
+    try:
+        mtime = os.stat(CONFIG_FILE).st_mtime
+    except OSError:
         print(f"[ERROR] {CONFIG_FILE} not found!")
         return None
+    if mtime == _config_cache["mtime"]:
+        return _config_cache["config"]
     try:
         with open(CONFIG_FILE, 'r') as f:
-            return json.load(f)
+            config = json.load(f)
     except Exception as e:
         print(f"[ERROR] Failed to load config: {e}")
         return None
+    _config_cache["mtime"] = mtime
+    _config_cache["config"] = config
+    return config
 
 def load_market_data(current_timeframe):
     """Load cached market data from json file."""
     if not os.path.exists(DATA_FILE):
         return {}
     try:
-        with open(DATA_FILE, 'r') as f:
-            data = json.load(f)
-            
+        if orjson is not None:
+            with open(DATA_FILE, 'rb') as f:
+                data = orjson.loads(f.read())
+        else:
+            with open(DATA_FILE, 'r') as f:
+                data = json.load(f)
+
+
         # Check metadata
         meta = data.get("_metadata", {})
         cached_timeframe = meta.get("timeframe")
@@ -60,7 +158,16 @@ def load_market_data(current_timeframe):
         if cached_timeframe != current_timeframe:
             print(f"[INFO] Timeframe changed ({cached_timeframe} -> {current_timeframe}). Wiping cache.")
             return {}
-            
+
+        # Coerce the price series to float64 arrays once here, so the
+        # indicator functions never re-convert JSON lists per call.
+        for key, entry in data.items():
+            if key == "_metadata" or not isinstance(entry, dict):
+                continue
+            for series in ("highs", "lows", "prices"):
+                if series in entry:
+                    entry[series] = np.asarray(entry[series], dtype=np.float64)
+
         return data
     except Exception as e:
         print(f"[WARNING] Failed to load market data, starting fresh: {e}")
@@ -69,29 +176,27 @@ def load_market_data(current_timeframe):
 def save_market_data(data):
     """Save market data to json file."""
     try:
-        with open(DATA_FILE, 'w') as f:
-            json.dump(data, f, indent=4)
+        if orjson is not None:
+            # Compact output (no indent) — the file is rewritten every cycle
+            with open(DATA_FILE, 'wb') as f:
+                f.write(orjson.dumps(data, option=orjson.OPT_SERIALIZE_NUMPY))
+        else:
+            with open(DATA_FILE, 'w') as f:
+                json.dump(data, f,
+                          default=lambda o: o.tolist() if isinstance(o, np.ndarray) else o)
     except Exception as e:
         print(f"[ERROR] Failed to save market data: {e}")
 
+@functools.lru_cache(maxsize=32)
 def get_interval_str(minutes):
     """Convert minutes integer to MEXC interval string."""
-    mapping = {
-        1: "Min1",
-        5: "Min5",
-        15: "Min15",
-        30: "Min30",
-        60: "Min60",
-        240: "Hour4",
-        480: "Hour8",
-        1440: "Day1",
-        10080: "Week1",
-        43200: "Month1"
-    }
-    return mapping.get(minutes, "Min15") # Default to Min15 if not found
+    return _INTERVAL_STR.get(minutes, "Min15") # Default to Min15 if not found
 
-def fetch_kline_data(symbol, interval_str, count=250):
-    """Fetch kline data from MEXC."""
+def fetch_kline_data(symbol, interval_str, count=250, start=None):
+    """Fetch kline data from MEXC.
+    When 'start' is given, fetch only bars from that timestamp onwards
+    (used for incremental refreshes) instead of a full 'count'-sized window.
+    """
     # Calculate time range
     # MEXC API uses seconds for timestamps
     end_time = int(time.time())
@@ -104,14 +209,12 @@ def fetch_kline_data(symbol, interval_str, count=250):
     # However, MEXC 'kline' endpoint behavior with just start/end:
     # We need to map interval_str back to seconds to calculate start time.
     
-    interval_seconds_map = {
-        "Min1": 60, "Min5": 300, "Min15": 900, "Min30": 1800,
-        "Min60": 3600, "Hour4": 14400, "Hour8": 28800,
-        "Day1": 86400, "Week1": 604800, "Month1": 2592000
-    }
-    interval_seconds = interval_seconds_map.get(interval_str, 900)
-    
-    start_time = end_time - (count * interval_seconds) 
+    interval_seconds = _INTERVAL_SECONDS.get(interval_str, 900)
+
+    if start is not None:
+        start_time = int(start)
+    else:
+        start_time = end_time - (count * interval_seconds)
 
     url = f"{BASE_URL}{KLINE_ENDPOINT.format(symbol=symbol)}"
     params = {
@@ -120,12 +223,9 @@ def fetch_kline_data(symbol, interval_str, count=250):
         "end": end_time
     }
     
-    headers = {
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36"
-    }
-    
     try:
-        response = requests.get(url, params=params, headers=headers, timeout=10)
+        _throttle()
+        response = SESSION.get(url, params=params, timeout=10)
         if response.status_code == 200:
             data = response.json()
             if data and data.get("success") and "data" in data:
@@ -164,29 +264,42 @@ def fetch_kline_data(symbol, interval_str, count=250):
     except Exception as e:
         raise Exception(f"Request failed: {str(e)}")
 
-def calculate_rsi(prices, period=14):
-    """Calculate RSI from a list of prices."""
+def _rsi_averages(prices, period):
+    """Run the full Wilder recurrence over 'prices'.
+    Returns (avg_gain, avg_loss) or None if not enough data.
+    """
     if len(prices) < period + 1:
         return None
-    
-    deltas = [prices[i] - prices[i-1] for i in range(1, len(prices))]
-    gains = [d if d > 0 else 0 for d in deltas]
-    losses = [-d if d < 0 else 0 for d in deltas]
-    
-    avg_gain = sum(gains[:period]) / period
-    avg_loss = sum(losses[:period]) / period
-    
-    # Smoothed RSI
-    for i in range(period, len(prices) - 1):
+
+    p = np.asarray(prices, dtype=np.float64)
+    deltas = np.diff(p)
+    gains = np.maximum(deltas, 0.0)
+    losses = np.maximum(-deltas, 0.0)
+
+    # Seed with simple averages of the first 'period' deltas
+    avg_gain = gains[:period].mean()
+    avg_loss = losses[:period].mean()
+
+    # Wilder smoothing over the remaining deltas
+    for i in range(period, len(deltas)):
         avg_gain = (avg_gain * (period - 1) + gains[i]) / period
         avg_loss = (avg_loss * (period - 1) + losses[i]) / period
-        
+
+    return float(avg_gain), float(avg_loss)
+
+def _rsi_value(avg_gain, avg_loss):
+    """Turn smoothed Wilder averages into the RSI value."""
     if avg_loss == 0:
         return 100.0
-    
     rs = avg_gain / avg_loss
-    rsi = 100 - (100 / (1 + rs))
-    return rsi
+    return float(100 - (100 / (1 + rs)))
+
+def calculate_rsi(prices, period=14):
+    """Calculate RSI from a list of prices."""
+    averages = _rsi_averages(prices, period)
+    if averages is None:
+        return None
+    return _rsi_value(averages[0], averages[1])
 
 def calculate_stochastic(highs, lows, closes, k_period=14, k_smooth=3, d_smooth=3):
     """Calculate Stochastic %K and %D.
@@ -195,35 +308,58 @@ def calculate_stochastic(highs, lows, closes, k_period=14, k_smooth=3, d_smooth=
     min_needed = k_period + k_smooth + d_smooth - 2
     if len(closes) < min_needed:
         return None, None
-    
-    # Step 1: Calculate raw %K values
-    raw_k_values = []
-    for i in range(k_period - 1, len(closes)):
-        highest_high = max(highs[i - k_period + 1 : i + 1])
-        lowest_low = min(lows[i - k_period + 1 : i + 1])
-        if highest_high == lowest_low:
-            raw_k_values.append(100.0)
-        else:
-            raw_k = ((closes[i] - lowest_low) / (highest_high - lowest_low)) * 100
-            raw_k_values.append(raw_k)
-    
+
+    h = np.asarray(highs, dtype=np.float64)
+    l = np.asarray(lows, dtype=np.float64)
+    c = np.asarray(closes, dtype=np.float64)
+
+    # Step 1: Raw %K — rolling max/min as windowed views reduced in NumPy C,
+    # no Python-level loop over the bars.
+    highest_high = sliding_window_view(h, k_period).max(axis=1)
+    lowest_low = sliding_window_view(l, k_period).min(axis=1)
+    window_range = highest_high - lowest_low
+    raw_k = np.where(
+        window_range == 0,
+        100.0,
+        (c[k_period - 1:] - lowest_low) / np.where(window_range == 0, 1.0, window_range) * 100,
+    )
+
     # Step 2: Smooth %K with SMA of k_smooth period
-    if len(raw_k_values) < k_smooth:
+    if len(raw_k) < k_smooth:
         return None, None
-    smoothed_k_values = []
-    for i in range(k_smooth - 1, len(raw_k_values)):
-        avg = sum(raw_k_values[i - k_smooth + 1 : i + 1]) / k_smooth
-        smoothed_k_values.append(avg)
-    
-    # Step 3: Calculate %D as SMA of smoothed %K with d_smooth period
-    if len(smoothed_k_values) < d_smooth:
+    smoothed_k = _running_mean(raw_k, k_smooth)
+
+    # Step 3: %D as SMA of smoothed %K with d_smooth period
+    if len(smoothed_k) < d_smooth:
         return None, None
-    d_values = []
-    for i in range(d_smooth - 1, len(smoothed_k_values)):
-        avg = sum(smoothed_k_values[i - d_smooth + 1 : i + 1]) / d_smooth
-        d_values.append(avg)
-    
-    return smoothed_k_values[-1], d_values[-1]
+    d_values = _running_mean(smoothed_k, d_smooth)
+
+    return float(smoothed_k[-1]), float(d_values[-1])
+
+def _running_mean(values, window):
+    """Rolling SMA via cumulative-sum differences — O(n) additions instead of
+    the O(n*window) multiply-adds a convolution performs.
+    """
+    cs = np.cumsum(values)
+    out = cs[window - 1:].copy()
+    out[1:] -= cs[:-window]
+    out /= window
+    return out
+
+@njit(cache=True, fastmath=True)
+def _ema_loop(prices, period):
+    """EMA recurrence over a float64 array. JIT-compiled when Numba is available."""
+    multiplier = 2.0 / (period + 1)
+    # Seed EMA with SMA of first 'period' prices
+    ema = 0.0
+    for i in range(period):
+        ema += prices[i]
+    ema /= period
+
+    for i in range(period, prices.shape[0]):
+        ema = (prices[i] - ema) * multiplier + ema
+
+    return ema
 
 def calculate_ema(prices, period):
     """Calculate EMA from a list of prices.
@@ -231,47 +367,21 @@ def calculate_ema(prices, period):
     """
     if len(prices) < period + 20:
         return None  # Not enough warm-up data
-    
-    multiplier = 2 / (period + 1)
-    # Seed EMA with SMA of first 'period' prices
-    ema = sum(prices[:period]) / period
-    
-    for price in prices[period:]:
-        ema = (price - ema) * multiplier + ema
-    
-    return ema
+
+    p = np.ascontiguousarray(prices, dtype=np.float64)
+    return float(_ema_loop(p, period))
 
 def calculate_atr(highs, lows, closes, period=14):
     """Calculate Average True Range (ATR) using Wilder's smoothing.
     Returns the latest ATR value, or None if not enough data.
     """
-    if len(closes) < period + 1:
+    atr_series = compute_atr_series(highs, lows, closes, period)
+    if len(atr_series) == 0:
         return None
-    
-    # Calculate True Range series
-    true_ranges = []
-    for i in range(1, len(closes)):
-        tr = max(
-            highs[i] - lows[i],
-            abs(highs[i] - closes[i - 1]),
-            abs(lows[i] - closes[i - 1])
-        )
-        true_ranges.append(tr)
-    
-    if len(true_ranges) < period:
-        return None
-    
-    # Seed ATR with SMA of first 'period' true ranges
-    atr = sum(true_ranges[:period]) / period
-    
-    # Wilder's smoothing
-    for i in range(period, len(true_ranges)):
-        atr = (atr * (period - 1) + true_ranges[i]) / period
-    
-    return atr
+    return float(atr_series[-1])
 
 def parse_ohlc(kline_data):
-    """Extract high, low, and close prices from kline data.
+    """Extract high, low, and close prices from kline data as float64 arrays.
     Returns (highs, lows, closes) tuple or (None, None, None) on failure.
     """
     try:
@@ -280,100 +390,323 @@ def parse_ohlc(kline_data):
             if ("close" in kline_data and isinstance(kline_data["close"], list)
                     and "high" in kline_data and isinstance(kline_data["high"], list)
                     and "low" in kline_data and isinstance(kline_data["low"], list)):
-                highs = [float(p) for p in kline_data["high"]]
-                lows = [float(p) for p in kline_data["low"]]
-                closes = [float(p) for p in kline_data["close"]]
+                highs = np.asarray(kline_data["high"], dtype=np.float64)
+                lows = np.asarray(kline_data["low"], dtype=np.float64)
+                closes = np.asarray(kline_data["close"], dtype=np.float64)
                 return highs, lows, closes
-        
+
         # Row-based format: list of dicts or list of lists
         if isinstance(kline_data, list):
             if len(kline_data) == 0:
-                return [], [], []
-            
+                empty = np.empty(0, dtype=np.float64)
+                return empty, empty.copy(), empty.copy()
+
             first_item = kline_data[0]
-            
+
             if isinstance(first_item, dict):
-                if all(k in first_item for k in ["close", "high", "low"]):
-                    highs = [float(x["high"]) for x in kline_data]
-                    lows = [float(x["low"]) for x in kline_data]
-                    closes = [float(x["close"]) for x in kline_data]
-                    return highs, lows, closes
-                if all(k in first_item for k in ["c", "h", "l"]):
-                    highs = [float(x["h"]) for x in kline_data]
-                    lows = [float(x["l"]) for x in kline_data]
-                    closes = [float(x["c"]) for x in kline_data]
-                    return highs, lows, closes
-        
+                # np.fromiter fills the preallocated array straight from the
+                # generator — no intermediate list of boxed floats
+                n = len(kline_data)
+                for hk, lk, ck in (("high", "low", "close"), ("h", "l", "c")):
+                    if all(k in first_item for k in (hk, lk, ck)):
+                        highs = np.fromiter((x[hk] for x in kline_data), dtype=np.float64, count=n)
+                        lows = np.fromiter((x[lk] for x in kline_data), dtype=np.float64, count=n)
+                        closes = np.fromiter((x[ck] for x in kline_data), dtype=np.float64, count=n)
+                        return highs, lows, closes
+
         return None, None, None
     except Exception as e:
         print(f"[ERROR] Parsing OHLC data failed: {e}")
         return None, None, None
 
+def parse_times(kline_data):
+    """Extract bar timestamps from kline data.
+    Returns a list of ints, or None if the payload has no usable time field.
+    """
+    try:
+        if isinstance(kline_data, dict) and isinstance(kline_data.get("time"), list):
+            return [int(t) for t in kline_data["time"]]
+
+        if isinstance(kline_data, list) and len(kline_data) > 0:
+            first_item = kline_data[0]
+            if isinstance(first_item, dict):
+                for key in ("time", "t"):
+                    if key in first_item:
+                        return [int(x[key]) for x in kline_data]
+
+        return None
+    except Exception:
+        return None
+
+# ── Incremental indicator state ──────────────────────────────────────────
+# The smoothed indicators (RSI, EMA, ATR) are recurrences: once seeded, a
+# new closed bar advances them in O(1) instead of re-running the full
+# history. The state below is persisted in market_data[symbol]["state"] and
+# covers closed bars only — the final bar of a kline response is still
+# forming, so display values advance a *copy* of the state through it.
+
+def update_rsi_state(rsi_state, prev_price, price):
+    """Advance the Wilder RSI averages by one closed bar (in place)."""
+    period = rsi_state["period"]
+    delta = price - prev_price
+    gain = delta if delta > 0 else 0.0
+    loss = -delta if delta < 0 else 0.0
+    rsi_state["avg_gain"] = (rsi_state["avg_gain"] * (period - 1) + gain) / period
+    rsi_state["avg_loss"] = (rsi_state["avg_loss"] * (period - 1) + loss) / period
+
+def update_ema_state(ema_state, price):
+    """Advance the EMA by one closed bar (in place)."""
+    multiplier = 2 / (ema_state["period"] + 1)
+    ema_state["ema"] = (price - ema_state["ema"]) * multiplier + ema_state["ema"]
+
+def update_atr_state(atr_state, high, low, prev_close):
+    """Advance the Wilder ATR by one closed bar (in place)."""
+    period = atr_state["period"]
+    tr = max(high - low, abs(high - prev_close), abs(low - prev_close))
+    atr_state["atr"] = (atr_state["atr"] * (period - 1) + tr) / period
+
+def seed_indicator_state(times, highs, lows, closes, periods):
+    """Build closed-bar indicator state from a full-history fetch.
+    'periods' maps each indicator (rsi / ema_long / ema_short / atr) to its
+    configured period; a sub-state stays None when there isn't enough data
+    for that indicator yet.
+    Returns the state dict, or None if the payload lacks usable timestamps.
+    """
+    if not times or len(times) != len(closes) or len(closes) < 2:
+        return None
+
+    closed_h = highs[:-1]
+    closed_l = lows[:-1]
+    closed_c = closes[:-1]
+
+    state = {
+        "last_ts": times[-2],
+        "prev_close": float(closed_c[-1]),
+        "periods": dict(periods),
+        "rsi": None,
+        "ema_long": None,
+        "ema_short": None,
+        "atr": None,
+    }
+
+    averages = _rsi_averages(closed_c, periods["rsi"])
+    if averages is not None:
+        state["rsi"] = {"avg_gain": averages[0], "avg_loss": averages[1], "period": periods["rsi"]}
+
+    for key in ("ema_long", "ema_short"):
+        ema = calculate_ema(closed_c, periods[key])
+        if ema is not None:
+            state[key] = {"ema": ema, "period": periods[key]}
+
+    atr = calculate_atr(closed_h, closed_l, closed_c, periods["atr"])
+    if atr is not None:
+        state["atr"] = {"atr": float(atr), "period": periods["atr"]}
+
+    return state
+
+def state_display_values(state, high, low, close):
+    """Advance a copy of the closed-bar state through the still-forming bar.
+    Returns (rsi, ema_long, ema_short, atr); each value is None when the
+    corresponding state could not be seeded.
+    """
+    prev_close = state["prev_close"]
+    rsi = ema_long = ema_short = atr = None
+
+    if state["rsi"] is not None:
+        rsi_state = dict(state["rsi"])
+        update_rsi_state(rsi_state, prev_close, close)
+        rsi = _rsi_value(rsi_state["avg_gain"], rsi_state["avg_loss"])
+
+    if state["ema_long"] is not None:
+        ema_state = dict(state["ema_long"])
+        update_ema_state(ema_state, close)
+        ema_long = ema_state["ema"]
+
+    if state["ema_short"] is not None:
+        ema_state = dict(state["ema_short"])
+        update_ema_state(ema_state, close)
+        ema_short = ema_state["ema"]
+
+    if state["atr"] is not None:
+        atr_state = dict(state["atr"])
+        update_atr_state(atr_state, high, low, prev_close)
+        atr = atr_state["atr"]
+
+    return rsi, ema_long, ema_short, atr
+
+def advance_market_entry(entry, times, highs, lows, closes, max_bars=250):
+    """Fold an incremental fetch (start=last_ts) into a cached symbol entry.
+    Replaces the cached snapshot of the forming bar with its final values,
+    advances the recurrences one step per newly closed bar, and keeps the
+    new forming bar out of the persisted state.
+    Returns True on success; False means the caller should fall back to a
+    full-history refresh.
+    """
+    state = entry.get("state")
+    if not state or not times or len(times) != len(closes):
+        return False
+    if len(entry.get("prices", [])) < 2:
+        return False
+
+    last_ts = state["last_ts"]
+    new_idx = [i for i, t in enumerate(times) if t > last_ts]
+    if not new_idx:
+        return False
+    first = new_idx[0]
+    if first == 0:
+        # Response starts after last_ts — a gap we cannot bridge incrementally
+        return False
+
+    # Advance the state over every new bar except the final (forming) one
+    for i in new_idx[:-1]:
+        if state["rsi"] is not None:
+            update_rsi_state(state["rsi"], state["prev_close"], closes[i])
+        if state["ema_long"] is not None:
+            update_ema_state(state["ema_long"], closes[i])
+        if state["ema_short"] is not None:
+            update_ema_state(state["ema_short"], closes[i])
+        if state["atr"] is not None:
+            update_atr_state(state["atr"], highs[i], lows[i], state["prev_close"])
+        state["prev_close"] = float(closes[i])
+        state["last_ts"] = times[i]
+
+    # Cached arrays end with the old forming-bar snapshot; drop it, append the
+    # fresh bars, and keep the window at max_bars bars.
+    for series, new_vals in (("highs", highs), ("lows", lows), ("prices", closes)):
+        old = np.asarray(entry[series], dtype=np.float64)
+        new = np.asarray(new_vals[first:], dtype=np.float64)
+        entry[series] = np.concatenate((old[:-1], new))[-max_bars:]
+
+    return True
+
+# Per-length cache of x-axis statistics for calculate_linear_regression:
+# x is always arange(length), so its centered values and Sxx are constants.
+_LR_X_CACHE = {}
+
+def _lr_x_stats(length):
+    """Return (x_centered, x_mean, Sxx) for x = arange(length), cached per length."""
+    stats = _LR_X_CACHE.get(length)
+    if stats is None:
+        x = np.arange(length, dtype=np.float64)
+        x_mean = (length - 1) / 2.0
+        x_centered = x - x_mean
+        sxx = float(np.dot(x_centered, x_centered))
+        stats = (x_centered, x_mean, sxx)
+        _LR_X_CACHE[length] = stats
+    return stats
+
+@njit(cache=True, fastmath=True)
+def _lr_reduce(y, x_mean):
+    """Fused reduction for the least-squares fit: returns (y_mean, Sxy, Sstot)
+    without materialising the centered arrays. JIT-compiled when Numba is
+    available; the numpy path in calculate_linear_regression is used otherwise.
+    """
+    n = y.shape[0]
+    sy = 0.0
+    for i in range(n):
+        sy += y[i]
+    y_mean = sy / n
+
+    sxy = 0.0
+    ss_tot = 0.0
+    for i in range(n):
+        dy = y[i] - y_mean
+        sxy += (i - x_mean) * dy
+        ss_tot += dy * dy
+    return y_mean, sxy, ss_tot
+
 def calculate_linear_regression(closes, length):
     """Compute linear regression over the last 'length' closing prices.
-    Uses numpy polyfit for vectorized least-squares fit.
+    Uses the closed-form least-squares solution — for a degree-1 fit the
+    Vandermonde/SVD machinery inside np.polyfit is overkill, and x is always
+    arange(length) so its statistics are cached per length.
     Returns (slope, intercept, r_squared) or (None, None, None) if insufficient data.
     """
     if closes is None or len(closes) < length:
         return None, None, None
-    
-    y = np.array(closes[-length:], dtype=np.float64)
-    x = np.arange(length, dtype=np.float64)
-    
-    # Least-squares linear fit: y = slope * x + intercept
-    slope, intercept = np.polyfit(x, y, 1)
-    
-    # R-squared: coefficient of determination
-    y_pred = slope * x + intercept
-    ss_res = np.sum((y - y_pred) ** 2)
-    ss_tot = np.sum((y - np.mean(y)) ** 2)
-    
+
+    y = np.ascontiguousarray(closes[-length:], dtype=np.float64)
+    x_centered, x_mean, sxx = _lr_x_stats(length)
+
+    if NUMBA_AVAILABLE:
+        y_mean, sxy, ss_tot = _lr_reduce(y, x_mean)
+    else:
+        # Closed-form fit without the compiled kernel
+        y_mean = float(y.mean())
+        sxy = float(np.dot(x_centered, y))
+        y_centered = y - y_mean
+        ss_tot = float(np.dot(y_centered, y_centered))
+
+    slope = sxy / sxx
+    intercept = y_mean - slope * x_mean
+
+    # R-squared via the identity ss_res = ss_tot - slope * Sxy
+    # (avoids a second pass over the residuals)
+    ss_res = ss_tot - slope * sxy
+
     if ss_tot == 0:
         r_squared = 0.0
     else:
         r_squared = 1.0 - (ss_res / ss_tot)
-    
+
     return slope, intercept, r_squared
 
-def compute_atr_series(highs, lows, closes, period):
-    """Compute a full ATR series using Wilder's smoothing.
-    Returns a list of ATR values (one per candle starting from index 'period'),
-    or an empty list if insufficient data.
-    """
-    if len(closes) < period + 1:
-        return []
-    
-    # True range series (starts from index 1)
-    true_ranges = []
-    for i in range(1, len(closes)):
-        tr = max(
-            highs[i] - lows[i],
-            abs(highs[i] - closes[i - 1]),
-            abs(lows[i] - closes[i - 1])
-        )
-        true_ranges.append(tr)
-    
-    if len(true_ranges) < period:
-        return []
-    
+@njit(cache=True, fastmath=True)
+def _wilder_loop(true_ranges, period):
+    """Wilder smoothing over a true-range array. JIT-compiled when Numba is available."""
     # Seed with SMA
-    atr = sum(true_ranges[:period]) / period
-    atr_values = [atr]
-    
+    atr = 0.0
+    for i in range(period):
+        atr += true_ranges[i]
+    atr /= period
+
+    atr_values = np.empty(true_ranges.shape[0] - period + 1, dtype=np.float64)
+    atr_values[0] = atr
+
     # Wilder's smoothing for the rest
-    for i in range(period, len(true_ranges)):
+    for i in range(period, true_ranges.shape[0]):
         atr = (atr * (period - 1) + true_ranges[i]) / period
-        atr_values.append(atr)
-    
+        atr_values[i - period + 1] = atr
+
     return atr_values
 
-def classify_trend(closes, highs, lows, lr_config):
+def compute_atr_series(highs, lows, closes, period):
+    """Compute a full ATR series using Wilder's smoothing.
+    Returns a float64 array of ATR values (one per candle starting from index
+    'period'), or an empty array if insufficient data.
+    """
+    if len(closes) < period + 1:
+        return np.empty(0, dtype=np.float64)
+
+    h = np.ascontiguousarray(highs, dtype=np.float64)
+    l = np.ascontiguousarray(lows, dtype=np.float64)
+    c = np.ascontiguousarray(closes, dtype=np.float64)
+
+    # True range as one fused vectorized expression instead of a per-bar loop
+    prev_close = c[:-1]
+    true_ranges = np.maximum(np.maximum(h[1:] - l[1:], np.abs(h[1:] - prev_close)),
+                             np.abs(l[1:] - prev_close))
+    return _wilder_loop(true_ranges, period)
+
+def warm_up_jit():
+    """Run the JIT-compiled loops once on dummy data so the first real symbol
+    doesn't pay the Numba compile cost. A cheap no-op when Numba is missing.
+    """
+    dummy = np.linspace(1.0, 2.0, 64)
+    _ema_loop(dummy, 5)
+    _wilder_loop(dummy, 5)
+    _lr_reduce(dummy, (dummy.shape[0] - 1) / 2.0)
+
+def classify_trend(closes, highs, lows, lr_config, atr_series=None):
     """Perform linear regression trend classification on a single asset/timeframe.
-    
+
     lr_config is a dict with keys:
         length, atr_length, r2_threshold, slope_threshold,
         sideways_slope_threshold, volatility_ma_length
-    
+
+    Callers that already have the ATR series for lr_config["atr_length"]
+    can pass it via atr_series to skip recomputing it here.
+
     Returns a dict with:
         slope, normalized_slope, r_squared, atr, volatility_regime,
         trend, confidence
@@ -392,12 +725,13 @@ def classify_trend(closes, highs, lows, lr_config):
         return None
     
     # --- ATR series for normalization and volatility regime ---
-    atr_series = compute_atr_series(highs, lows, closes, atr_length)
-    if not atr_series:
+    if atr_series is None:
+        atr_series = compute_atr_series(highs, lows, closes, atr_length)
+    if len(atr_series) == 0:
         return None
     
-    current_atr = atr_series[-1]
-    
+    current_atr = float(atr_series[-1])
+
     # Guard against zero / near-zero ATR
     if current_atr < 1e-12:
         return None
@@ -406,7 +740,7 @@ def classify_trend(closes, highs, lows, lr_config):
     
     # --- Volatility regime ---
     if len(atr_series) >= volatility_ma_length:
-        atr_ma = sum(atr_series[-volatility_ma_length:]) / volatility_ma_length
+        atr_ma = float(np.mean(atr_series[-volatility_ma_length:]))
         volatility_regime = "HIGH" if current_atr > atr_ma else "LOW"
     else:
         # Not enough ATR history for MA, default to unknown
@@ -438,50 +772,43 @@ def classify_trend(closes, highs, lows, lr_config):
         "confidence": confidence,
     }
 
+# Label buckets scanned with bisect instead of if/elif chains; index i covers
+# values below _*_THRESHOLDS[i], the last entry covers everything above.
+_CONFIDENCE_THRESHOLDS = (0.15, 0.4, 0.7)
+_CONFIDENCE_LABELS = ((GREY, "Very Weak"), (YELLOW, "Weak"), (CYAN, "Moderate"), (GREEN, "Strong"))
+_R2_THRESHOLDS = (0.2, 0.4, 0.7)
+_R2_LABELS = ((GREY, "Poor fit"), (YELLOW, "Fair fit"), (CYAN, "Good fit"), (GREEN, "Excellent fit"))
+_VOLATILITY_LABELS = {"HIGH": f"{RED}HIGH{RESET}", "LOW": f"{CYAN}LOW{RESET}"}
+_TREND_COLORS = {"Uptrend": GREEN, "Downtrend": RED, "Sideways": YELLOW}
+
 def format_confidence_label(confidence):
     """Return a color-coded text label for confidence score."""
-    if confidence >= 0.7:
-        return f"\033[92m{confidence:.4f} (Strong)\033[0m"
-    elif confidence >= 0.4:
-        return f"\033[96m{confidence:.4f} (Moderate)\033[0m"
-    elif confidence >= 0.15:
-        return f"\033[93m{confidence:.4f} (Weak)\033[0m"
-    else:
-        return f"\033[90m{confidence:.4f} (Very Weak)\033[0m"
+    color, word = _CONFIDENCE_LABELS[bisect.bisect_right(_CONFIDENCE_THRESHOLDS, confidence)]
+    return f"{color}{confidence:.4f} ({word}){RESET}"
 
 def format_r2_label(r2):
     """Return a color-coded text label for R² value."""
-    if r2 >= 0.7:
-        return f"\033[92m{r2:.4f} (Excellent fit)\033[0m"
-    elif r2 >= 0.4:
-        return f"\033[96m{r2:.4f} (Good fit)\033[0m"
-    elif r2 >= 0.2:
-        return f"\033[93m{r2:.4f} (Fair fit)\033[0m"
-    else:
-        return f"\033[90m{r2:.4f} (Poor fit)\033[0m"
+    color, word = _R2_LABELS[bisect.bisect_right(_R2_THRESHOLDS, r2)]
+    return f"{color}{r2:.4f} ({word}){RESET}"
 
 def format_volatility_label(regime):
     """Return a color-coded volatility regime label."""
-    if regime == "HIGH":
-        return f"\033[91mHIGH\033[0m"
-    elif regime == "LOW":
-        return f"\033[96mLOW\033[0m"
-    else:
-        return f"\033[90mN/A\033[0m"
+    return _VOLATILITY_LABELS.get(regime, f"{GREY}N/A{RESET}")
 
-def print_lr_result(symbol, tf_label, lr_result):
-    """Print a formatted, multi-line linear regression result block."""
-    trend_color = {"Uptrend": "\033[92m", "Downtrend": "\033[91m", "Sideways": "\033[93m"}
-    tc = trend_color.get(lr_result['trend'], "")
-    
-    print(f"   ┌─ LR({tf_label})")
-    print(f"   │  Trend:       {tc}{lr_result['trend']}\033[0m")
-    print(f"   │  Slope:       {lr_result['slope']:.6f}  (normalized: {lr_result['normalized_slope']:.4f})")
-    print(f"   │  R²:          {format_r2_label(lr_result['r_squared'])}")
-    print(f"   │  ATR:         {lr_result['atr']:.4f}")
-    print(f"   │  Volatility:  {format_volatility_label(lr_result['volatility_regime'])}")
-    print(f"   │  Confidence:  {format_confidence_label(lr_result['confidence'])}")
-    print(f"   └─")
+def lr_result_lines(tf_label, lr_result):
+    """Format a multi-line linear regression result block as a list of lines."""
+    tc = _TREND_COLORS.get(lr_result['trend'], "")
+
+    return [
+        f"   ┌─ LR({tf_label})",
+        f"   │  Trend:       {tc}{lr_result['trend']}{RESET}",
+        f"   │  Slope:       {lr_result['slope']:.6f}  (normalized: {lr_result['normalized_slope']:.4f})",
+        f"   │  R²:          {format_r2_label(lr_result['r_squared'])}",
+        f"   │  ATR:         {lr_result['atr']:.4f}",
+        f"   │  Volatility:  {format_volatility_label(lr_result['volatility_regime'])}",
+        f"   │  Confidence:  {format_confidence_label(lr_result['confidence'])}",
+        f"   └─",
+    ]
 
 def main():
     # Ensure Unicode box-drawing characters display properly on Windows
@@ -489,7 +816,8 @@ def main():
         sys.stdout.reconfigure(encoding='utf-8')
     
     print("--- MEXC RSI Screener Bot Started ---")
-    
+    warm_up_jit()
+
     while True:
         config = load_config()
         if not config:
@@ -535,167 +863,271 @@ def main():
         market_data = load_market_data(timeframe_mins)
         
         refreshed_count = 0
-        
+
+        indicator_periods = {
+            "rsi": rsi_period,
+            "ema_long": ema_long_period,
+            "ema_short": ema_short_period,
+            "atr": atr_period,
+        }
+
+        # Fewest bars for which every indicator below can produce a value.
+        # Fetch a margin beyond it so the longest EMA gets proper warm-up
+        # instead of scraping by on the bare minimum.
+        min_bars_needed = max(
+            rsi_period + 1,
+            ema_long_period + 20,
+            atr_period + 1,
+            stoch_k_period + stoch_k_smooth + stoch_d_smooth - 2,
+            lr_config["length"],
+        )
+        fetch_count = max(250, min_bars_needed + 30)
+
+        # Fetch all symbols concurrently — the shared session and throttle keep
+        # us under MEXC's rate limit while the network waits overlap. Analysis
+        # below stays sequential so the printed blocks keep their order.
+        # Symbols with valid cached state only fetch bars since their last
+        # closed bar; everything else gets a full-history window.
+        fetched = {}
+        htf_fetched = {}
+        incremental_syms = set()
+        with ThreadPoolExecutor(max_workers=10) as executor:
+            futures = {}
+            htf_futures = {}
+            for symbol in assets:
+                state = market_data.get(symbol, {}).get("state")
+                if state and state.get("periods") == indicator_periods:
+                    futures[executor.submit(fetch_kline_data, symbol, interval_str,
+                                            fetch_count, state["last_ts"])] = symbol
+                    incremental_syms.add(symbol)
+                else:
+                    futures[executor.submit(fetch_kline_data, symbol, interval_str,
+                                            fetch_count)] = symbol
+                # The higher-timeframe window rides in the same batch, so it
+                # doesn't add a serial round-trip per symbol during analysis
+                if lr_higher_tf != timeframe_mins:
+                    htf_futures[executor.submit(fetch_kline_data, symbol, lr_higher_interval_str,
+                                                lr_config["length"] + 50)] = symbol
+            for future in as_completed(list(futures) + list(htf_futures)):
+                if future in futures:
+                    sym, results = futures[future], fetched
+                else:
+                    sym, results = htf_futures[future], htf_fetched
+                try:
+                    results[sym] = future.result()
+                except Exception as e:
+                    print(f"[ERROR] {sym}: {e}")
+                    results[sym] = None
+
         for symbol in assets:
             cached_asset = market_data.get(symbol, {})
             last_updated = cached_asset.get("last_updated", 0)
             now = time.time()
-            
-            print(f"\n{'═' * 50}")
-            print(f" ■ {symbol}  [{datetime.now().strftime('%H:%M:%S')}]")
-            print(f"{'═' * 50}")
-            
-            time.sleep(0.15)  # Rate limit: MEXC allows 20 req/2s, this keeps us safely under
-            raw_data = fetch_kline_data(symbol, interval_str)
-            if raw_data:
+
+            # Each symbol's block is assembled into a line buffer and written
+            # in one go — one syscall per symbol instead of ~25 print calls
+            out = []
+            out.append(f"\n{'═' * 50}")
+            out.append(f" ■ {symbol}  [{datetime.now().strftime('%H:%M:%S')}]")
+            out.append(f"{'═' * 50}")
+
+            raw_data = fetched.get(symbol)
+            applied = False
+            if raw_data and symbol in incremental_syms:
                 highs, lows, closes = parse_ohlc(raw_data)
-                
-                if closes:
-                    market_data[symbol] = {
-                        "last_updated": now,
-                        "highs": highs,
-                        "lows": lows,
-                        "prices": closes,
-                    }
+                times = parse_times(raw_data)
+                if closes is not None and len(closes) and advance_market_entry(market_data[symbol], times, highs, lows, closes, fetch_count):
+                    market_data[symbol]["last_updated"] = now
                     refreshed_count += 1
+                    applied = True
                 else:
-                    print(f" > {symbol}: Failed to parse updated data.")
-            else:
-                print(f" > {symbol}: Failed to fetch data.")
+                    # Incremental window unusable (gap or format change) — refetch in full
+                    try:
+                        raw_data = fetch_kline_data(symbol, interval_str, fetch_count)
+                    except Exception as e:
+                        out.append(f"[ERROR] {symbol}: {e}")
+                        raw_data = None
+
+            if not applied:
+                if raw_data:
+                    highs, lows, closes = parse_ohlc(raw_data)
+                    times = parse_times(raw_data)
+
+                    if closes is not None and len(closes):
+                        market_data[symbol] = {
+                            "last_updated": now,
+                            "highs": highs,
+                            "lows": lows,
+                            "prices": closes,
+                            "state": seed_indicator_state(times, highs, lows, closes, indicator_periods),
+                        }
+                        refreshed_count += 1
+                    else:
+                        out.append(f" > {symbol}: Failed to parse updated data.")
+                else:
+                    out.append(f" > {symbol}: Failed to fetch data.")
 
             current_asset_data = market_data.get(symbol)
             if not current_asset_data or "prices" not in current_asset_data:
                 if now - last_updated < (timeframe_mins * 60):
                     pass
+                sys.stdout.write("\n".join(out) + "\n")
+                sys.stdout.flush()
                 continue
-            
+
             prices = current_asset_data["prices"]
             highs = current_asset_data.get("highs", [])
             lows = current_asset_data.get("lows", [])
-            current_price = prices[-1] if prices else None
-            
+            current_price = prices[-1] if len(prices) else None
+
+            # Too little history for any indicator — skip the whole block
+            # rather than running five passes that all return None.
+            if len(prices) < min_bars_needed:
+                out.append(f" > {symbol}: Insufficient data "
+                           f"({len(prices)}/{min_bars_needed} bars)")
+                sys.stdout.write("\n".join(out) + "\n")
+                sys.stdout.flush()
+                continue
+
+            # ATR series shared between the EMA-proximity check and the LR
+            # block below, so it's only computed once per symbol.
+            lr_atr_series = compute_atr_series(highs, lows, prices, lr_config["atr_length"])
+
+            # Smoothed indicators: advance the persisted closed-bar state
+            # through the forming bar when available (O(1)); otherwise fall
+            # back to a full-history recompute.
+            state = current_asset_data.get("state")
+            if state and len(prices) >= 2 and len(highs) >= 2 and len(lows) >= 2:
+                rsi, ema_long, ema_short, atr = state_display_values(
+                    state, highs[-1], lows[-1], prices[-1])
+            else:
+                rsi = calculate_rsi(prices, rsi_period)
+                ema_long = calculate_ema(prices, ema_long_period)
+                ema_short = calculate_ema(prices, ema_short_period)
+                if atr_period == lr_config["atr_length"] and len(lr_atr_series):
+                    atr = float(lr_atr_series[-1])
+                else:
+                    atr = calculate_atr(highs, lows, prices, atr_period)
+
             # --- RSI Analysis ---
-            print(f"\n ┌─ RSI")
-            rsi = calculate_rsi(prices, rsi_period)
+            out.append(f"\n ┌─ RSI")
             if rsi is not None:
-                print(f" │  RSI({rsi_period}): {rsi:.2f}")
+                out.append(f" │  RSI({rsi_period}): {rsi:.2f}")
                 if rsi > rsi_overbought:
-                    print(f" │  \033[91m[ALERT] RSI {rsi:.2f} (> {rsi_overbought}) — OVERBOUGHT!\033[0m")
+                    out.append(f" │  {RED}[ALERT] RSI {rsi:.2f} (> {rsi_overbought}) — OVERBOUGHT!{RESET}")
                     send_notification(symbol, rsi, "RSI OVERBOUGHT")
                 elif rsi < rsi_oversold:
-                    print(f" │  \033[92m[ALERT] RSI {rsi:.2f} (< {rsi_oversold}) — OVERSOLD!\033[0m")
+                    out.append(f" │  {GREEN}[ALERT] RSI {rsi:.2f} (< {rsi_oversold}) — OVERSOLD!{RESET}")
                     send_notification(symbol, rsi, "RSI OVERSOLD")
             else:
-                print(f" │  Not enough data for RSI")
-            print(f" └─")
-            
+                out.append(f" │  Not enough data for RSI")
+            out.append(f" └─")
+
             # --- EMA Analysis ---
-            print(f"\n ┌─ EMA")
-            ema_long = calculate_ema(prices, ema_long_period)
-            ema_short = calculate_ema(prices, ema_short_period)
-            
+            out.append(f"\n ┌─ EMA")
             if ema_long is not None and current_price is not None:
                 position_long = "ABOVE" if current_price > ema_long else "BELOW"
-                pos_color = "\033[92m" if current_price > ema_long else "\033[91m"
-                print(f" │  EMA({ema_long_period}): {ema_long:.4f}  →  Price is {pos_color}{position_long}\033[0m")
+                pos_color = GREEN if current_price > ema_long else RED
+                out.append(f" │  EMA({ema_long_period}): {ema_long:.4f}  →  Price is {pos_color}{position_long}{RESET}")
             else:
-                print(f" │  EMA({ema_long_period}): Not enough data")
-            
+                out.append(f" │  EMA({ema_long_period}): Not enough data")
+
             if ema_short is not None and current_price is not None:
-                atr = calculate_atr(highs, lows, prices, atr_period)
                 distance = abs(current_price - ema_short)
                 position_short = "above" if current_price > ema_short else "below"
-                
+
                 if atr is not None and atr > 0:
                     atr_ratio = distance / atr
-                    print(f" │  EMA({ema_short_period}): {ema_short:.4f}  →  Distance/ATR: {atr_ratio:.2f}")
+                    out.append(f" │  EMA({ema_short_period}): {ema_short:.4f}  →  Distance/ATR: {atr_ratio:.2f}")
                     if atr_ratio <= ema_proximity_atr_ratio:
-                        print(f" │  \033[93m[INFO] Price is close to EMA({ema_short_period}), {position_short} it\033[0m")
+                        out.append(f" │  {YELLOW}[INFO] Price is close to EMA({ema_short_period}), {position_short} it{RESET}")
                 else:
-                    print(f" │  EMA({ema_short_period}): {ema_short:.4f}  →  ATR: not enough data")
+                    out.append(f" │  EMA({ema_short_period}): {ema_short:.4f}  →  ATR: not enough data")
             else:
-                print(f" │  EMA({ema_short_period}): Not enough data")
-            print(f" └─")
+                out.append(f" │  EMA({ema_short_period}): Not enough data")
+            out.append(f" └─")
             
             # --- Stochastic Analysis ---
-            print(f"\n ┌─ Stochastic")
-            if highs and lows:
+            out.append(f"\n ┌─ Stochastic")
+            if len(highs) and len(lows):
                 stoch_k, stoch_d = calculate_stochastic(highs, lows, prices, stoch_k_period, stoch_k_smooth, stoch_d_smooth)
-                
+
                 if stoch_k is not None and stoch_d is not None:
-                    print(f" │  %K: {stoch_k:.2f}  |  %D: {stoch_d:.2f}")
-                    
+                    out.append(f" │  %K: {stoch_k:.2f}  |  %D: {stoch_d:.2f}")
+
                     stoch_is_overbought = stoch_k > stoch_overbought or stoch_d > stoch_overbought
                     stoch_is_oversold = stoch_k < stoch_oversold or stoch_d < stoch_oversold
-                    
+
                     if stoch_alert_method == 1:
                         if stoch_is_overbought:
-                            print(f" │  \033[91m[ALERT] %K:{stoch_k:.2f} %D:{stoch_d:.2f} (> {stoch_overbought}) — OVERBOUGHT!\033[0m")
+                            out.append(f" │  {RED}[ALERT] %K:{stoch_k:.2f} %D:{stoch_d:.2f} (> {stoch_overbought}) — OVERBOUGHT!{RESET}")
                             send_notification(symbol, stoch_k, "STOCH OVERBOUGHT")
                         elif stoch_is_oversold:
-                            print(f" │  \033[92m[ALERT] %K:{stoch_k:.2f} %D:{stoch_d:.2f} (< {stoch_oversold}) — OVERSOLD!\033[0m")
+                            out.append(f" │  {GREEN}[ALERT] %K:{stoch_k:.2f} %D:{stoch_d:.2f} (< {stoch_oversold}) — OVERSOLD!{RESET}")
                             send_notification(symbol, stoch_d, "STOCH OVERSOLD")
-                    
+
                     elif stoch_alert_method == 2:
                         if ema_long is None:
-                            print(f" │  [INFO] Method 2 requires EMA({ema_long_period}), falling back to method 1")
+                            out.append(f" │  [INFO] Method 2 requires EMA({ema_long_period}), falling back to method 1")
                             if stoch_is_overbought:
-                                print(f" │  \033[91m[ALERT] %K:{stoch_k:.2f} %D:{stoch_d:.2f} (> {stoch_overbought}) — OVERBOUGHT!\033[0m")
+                                out.append(f" │  {RED}[ALERT] %K:{stoch_k:.2f} %D:{stoch_d:.2f} (> {stoch_overbought}) — OVERBOUGHT!{RESET}")
                                 send_notification(symbol, stoch_k, "STOCH OVERBOUGHT")
                             elif stoch_is_oversold:
-                                print(f" │  \033[92m[ALERT] %K:{stoch_k:.2f} %D:{stoch_d:.2f} (< {stoch_oversold}) — OVERSOLD!\033[0m")
+                                out.append(f" │  {GREEN}[ALERT] %K:{stoch_k:.2f} %D:{stoch_d:.2f} (< {stoch_oversold}) — OVERSOLD!{RESET}")
                                 send_notification(symbol, stoch_d, "STOCH OVERSOLD")
                         else:
                             if stoch_is_oversold and current_price > ema_long:
-                                print(f" │  \033[92m[ALERT] %K:{stoch_k:.2f} %D:{stoch_d:.2f} (< {stoch_oversold}) + Above EMA({ema_long_period}) — OVERSOLD BUY!\033[0m")
+                                out.append(f" │  {GREEN}[ALERT] %K:{stoch_k:.2f} %D:{stoch_d:.2f} (< {stoch_oversold}) + Above EMA({ema_long_period}) — OVERSOLD BUY!{RESET}")
                                 send_notification(symbol, stoch_d, f"STOCH OVERSOLD + Above EMA({ema_long_period})")
                             elif stoch_is_oversold and current_price <= ema_long:
-                                print(f" │  \033[90m[INFO] Oversold but below EMA({ema_long_period}) — filtered\033[0m")
-                            
+                                out.append(f" │  {GREY}[INFO] Oversold but below EMA({ema_long_period}) — filtered{RESET}")
+
                             if stoch_is_overbought and current_price < ema_long:
-                                print(f" │  \033[91m[ALERT] %K:{stoch_k:.2f} %D:{stoch_d:.2f} (> {stoch_overbought}) + Below EMA({ema_long_period}) — OVERBOUGHT SELL!\033[0m")
+                                out.append(f" │  {RED}[ALERT] %K:{stoch_k:.2f} %D:{stoch_d:.2f} (> {stoch_overbought}) + Below EMA({ema_long_period}) — OVERBOUGHT SELL!{RESET}")
                                 send_notification(symbol, stoch_d, f"STOCH OVERBOUGHT + Below EMA({ema_long_period})")
                             elif stoch_is_overbought and current_price >= ema_long:
-                                print(f" │  \033[90m[INFO] Overbought but above EMA({ema_long_period}) — filtered\033[0m")
+                                out.append(f" │  {GREY}[INFO] Overbought but above EMA({ema_long_period}) — filtered{RESET}")
                 else:
-                    print(f" │  Not enough data for Stochastic")
+                    out.append(f" │  Not enough data for Stochastic")
             else:
-                print(f" │  No high/low data available")
-            print(f" └─")
+                out.append(f" │  No high/low data available")
+            out.append(f" └─")
             
             # --- Linear Regression Analysis (Default Timeframe) ---
-            print()  # spacing
+            out.append("")  # spacing
             tf_label = get_interval_str(timeframe_mins)
-            lr_result = classify_trend(prices, highs, lows, lr_config)
+            lr_result = classify_trend(prices, highs, lows, lr_config, atr_series=lr_atr_series)
             if lr_result:
-                print_lr_result(symbol, tf_label, lr_result)
+                out.extend(lr_result_lines(tf_label, lr_result))
             else:
-                print(f"   ┌─ LR({tf_label})")
-                print(f"   │  Not enough data")
-                print(f"   └─")
-            
+                out.append(f"   ┌─ LR({tf_label})")
+                out.append(f"   │  Not enough data")
+                out.append(f"   └─")
+
             # --- Linear Regression Analysis (Higher Timeframe) ---
             if lr_higher_tf != timeframe_mins:
-                time.sleep(0.15)  # Rate limit guard
-                htf_raw = fetch_kline_data(symbol, lr_higher_interval_str, count=lr_config["length"] + 50)
+                htf_raw = htf_fetched.get(symbol)
                 if htf_raw:
                     htf_highs, htf_lows, htf_closes = parse_ohlc(htf_raw)
-                    if htf_closes:
+                    if htf_closes is not None and len(htf_closes):
                         lr_htf_result = classify_trend(htf_closes, htf_highs, htf_lows, lr_config)
                         if lr_htf_result:
-                            print_lr_result(symbol, lr_higher_interval_str, lr_htf_result)
+                            out.extend(lr_result_lines(lr_higher_interval_str, lr_htf_result))
                         else:
-                            print(f"   ┌─ LR({lr_higher_interval_str})")
-                            print(f"   │  Not enough data")
-                            print(f"   └─")
+                            out.append(f"   ┌─ LR({lr_higher_interval_str})")
+                            out.append(f"   │  Not enough data")
+                            out.append(f"   └─")
                     else:
-                        print(f"   ┌─ LR({lr_higher_interval_str})")
-                        print(f"   │  Failed to parse data")
-                        print(f"   └─")
+                        out.append(f"   ┌─ LR({lr_higher_interval_str})")
+                        out.append(f"   │  Failed to parse data")
+                        out.append(f"   └─")
                 else:
-                    print(f"   ┌─ LR({lr_higher_interval_str})")
-                    print(f"   │  Failed to fetch data")
-                    print(f"   └─")
+                    out.append(f"   ┌─ LR({lr_higher_interval_str})")
+                    out.append(f"   │  Failed to fetch data")
+                    out.append(f"   └─")
+
+            sys.stdout.write("\n".join(out) + "\n")
+            sys.stdout.flush()
         
         # Save updated data
         if refreshed_count > 0:
@@ -703,19 +1135,26 @@ def main():
             save_market_data(market_data)
             print(f"\nRefreshed {refreshed_count} assets.")
         
-        # Calculate time to next interval
-        now_ts = int(time.time())
+        # Calculate time to next interval. Wall clock only picks the target
+        # candle boundary; the actual wait runs against the monotonic clock
+        # below, so NTP steps can't produce negative or runaway sleeps.
         interval_seconds = timeframe_mins * 60
-        next_interval = ((now_ts // interval_seconds) + 1) * interval_seconds
-        sleep_seconds = next_interval - now_ts
-        
+        now_ts = time.time()
+        target_wallclock = ((int(now_ts) // interval_seconds) + 1) * interval_seconds
+        sleep_seconds = max(0.0, target_wallclock - now_ts)
+
         print("-" * 30)
-        # Countdown loop
-        for i in range(sleep_seconds, 0, -1):
-            print(f"\rNext check in {i}s...   ", end="", flush=True)
-            time.sleep(1)
+        # Countdown against a monotonic deadline — no per-second drift, and the
+        # final sleep is trimmed to land exactly on the interval boundary
+        deadline = time.monotonic() + sleep_seconds
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            print(f"\rNext check in {int(remaining)}s...   ", end="", flush=True)
+            time.sleep(min(1.0, remaining))
         print("\rChecking for updates...   ", end="", flush=True)
-        print() 
+        print()
 
 if __name__ == "__main__":
     main()
@@ -144,8 +144,11 @@ function connectSSE() {
 
     eventSource.onmessage = (event) => {
         try {
-            const msg = JSON.parse(event.data);
-            handleEvent(msg.type, msg.data);
+            // The server coalesces events into array frames; heartbeats
+            // still arrive as single objects
+            const parsed = JSON.parse(event.data);
+            const messages = Array.isArray(parsed) ? parsed : [parsed];
+            messages.forEach(msg => handleEvent(msg.type, msg.data));
         } catch (e) {
             console.error('SSE parse error:', e);
         }
@@ -285,8 +288,8 @@ function renderTable() {
             <td>${formatEmaShort(asset)}</td>
             <td>${asset.atr_ratio != null ? asset.atr_ratio.toFixed(2) : '<span class="cell-note">—</span>'}</td>
             <td class="${trendClass(asset.lr_trend)}">${formatTrend(asset.lr_trend, asset.lr_note)}</td>
-            <td class="${confidenceClass(asset.lr_confidence)}">${asset.lr_confidence != null ? asset.lr_confidence : '<span class="cell-note">—</span>'}</td>
-            <td>${asset.lr_r_squared != null ? asset.lr_r_squared : '<span class="cell-note">—</span>'}</td>
+            <td class="${confidenceClass(asset.lr_confidence)}">${asset.lr_confidence != null ? asset.lr_confidence.toFixed(4) : '<span class="cell-note">—</span>'}</td>
+            <td>${asset.lr_r_squared != null ? asset.lr_r_squared.toFixed(4) : '<span class="cell-note">—</span>'}</td>
             <td class="${volatilityClass(asset.lr_volatility)}">${asset.lr_volatility || '<span class="cell-note">—</span>'}</td>
             <td class="${trendClass(asset.lr_htf_trend)}">${formatTrend(asset.lr_htf_trend, asset.lr_htf_note)}</td>
             <td>${formatAlerts(asset.alerts)}</td>
@@ -332,7 +335,7 @@ function formatEmaShort(asset) {
     if (asset.ema_proximity) {
         return `<span class="alert-tag alert-tag-warning">${asset.ema_proximity}</span>`;
     }
-    return `<span class="cell-neutral">${asset.ema_short}</span>`;
+    return `<span class="cell-neutral">${asset.ema_short.toFixed(4)}</span>`;
 }
 
 function formatAlerts(alerts) {
@@ -8,22 +8,33 @@ from gevent import monkey
 monkey.patch_all()
 
 from flask import Flask, render_template, jsonify, request, Response
+import collections
+import heapq
 import threading
-import json
 import time
 import os
-import queue
 import uuid
+
+import orjson
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 
+import numpy as np
+
 # Import analysis functions from the existing screener
 from mexc_rsi_screener import (
     load_market_data, save_market_data,
-    get_interval_str, fetch_kline_data, parse_ohlc,
+    get_interval_str, fetch_kline_data, parse_ohlc, parse_times,
     calculate_rsi, calculate_stochastic, calculate_ema, calculate_atr,
-    classify_trend
+    compute_atr_series, classify_trend,
+    seed_indicator_state, state_display_values, advance_market_entry
 )
 
+try:
+    import talib
+except ImportError:
+    talib = None  # TA-Lib unavailable; use the screener's NumPy implementations
+
 app = Flask(__name__)
 
 # ── Default Config (used when a new user visits for the first time) ────
@@ -53,11 +64,144 @@ DEFAULT_CONFIG = {
 }
 
 
+# ── Indicator dispatch ────────────────────────────────────────
+# Thin wrappers that use TA-Lib's C implementations when the library is
+# installed and fall back to the screener's own functions otherwise. All
+# return plain floats (or None when the warm-up window isn't covered).
+
+def _last_or_none(arr):
+    last = arr[-1]
+    return None if np.isnan(last) else float(last)
+
+
+def compute_rsi(closes, period):
+    if talib is not None and len(closes) > period:
+        return _last_or_none(talib.RSI(np.asarray(closes, dtype=np.float64), timeperiod=period))
+    return calculate_rsi(closes, period)
+
+
+def compute_ema(closes, period):
+    # Keep the screener's warm-up requirement so both paths agree on when
+    # an EMA is considered reliable enough to display
+    if talib is not None and len(closes) >= period + 20:
+        return _last_or_none(talib.EMA(np.asarray(closes, dtype=np.float64), timeperiod=period))
+    return calculate_ema(closes, period)
+
+
+def compute_atr(highs, lows, closes, period):
+    if talib is not None and len(closes) > period:
+        return _last_or_none(talib.ATR(
+            np.asarray(highs, dtype=np.float64),
+            np.asarray(lows, dtype=np.float64),
+            np.asarray(closes, dtype=np.float64),
+            timeperiod=period))
+    return calculate_atr(highs, lows, closes, period)
+
+
+def compute_stochastic(highs, lows, closes, k_period, k_smooth, d_smooth):
+    if talib is not None and len(closes) >= k_period + k_smooth + d_smooth - 2:
+        slowk, slowd = talib.STOCH(
+            np.asarray(highs, dtype=np.float64),
+            np.asarray(lows, dtype=np.float64),
+            np.asarray(closes, dtype=np.float64),
+            fastk_period=k_period,
+            slowk_period=k_smooth, slowk_matype=0,
+            slowd_period=d_smooth, slowd_matype=0)
+        return _last_or_none(slowk), _last_or_none(slowd)
+    return calculate_stochastic(highs, lows, closes, k_period, k_smooth, d_smooth)
+
+
+# ── Shared kline cache ────────────────────────────────────────
+# Concurrent sessions often watch the same symbols (the defaults overlap),
+# so raw kline responses are shared process-wide for most of a bar instead
+# of each session hitting MEXC for identical data.
+_kline_cache = {}
+_kline_cache_lock = threading.Lock()
+_KLINE_CACHE_MAX_AGE = 3600  # sweep anything this stale regardless of TTL
+
+
+def cached_fetch(symbol, interval_str, ttl, count=250):
+    """fetch_kline_data with a short-TTL process-global cache.
+    Returns the cached raw payload when it is younger than ttl seconds;
+    failed (empty) fetches are never cached so the next caller retries.
+    """
+    key = (symbol, interval_str, count)
+    with _kline_cache_lock:
+        hit = _kline_cache.get(key)
+        if hit and time.monotonic() - hit[0] < ttl:
+            return hit[1]
+    raw = fetch_kline_data(symbol, interval_str, count)
+    if raw:
+        with _kline_cache_lock:
+            _kline_cache[key] = (time.monotonic(), raw)
+    return raw
+
+
+def _sweep_kline_cache():
+    """Drop cache entries no session could still consider fresh."""
+    cutoff = time.monotonic() - _KLINE_CACHE_MAX_AGE
+    with _kline_cache_lock:
+        stale = [k for k, (ts, _) in _kline_cache.items() if ts < cutoff]
+        for k in stale:
+            del _kline_cache[k]
+
+
+def derive_htf_ohlc(times, highs, lows, closes, ratio, htf_seconds):
+    """Downsample base-timeframe bars into higher-timeframe OHLC arrays.
+    The head is trimmed to the first bar that opens an HTF bucket so groups
+    align with real HTF candles; the trailing partial group plays the role
+    of the forming HTF bar, matching what the HTTP endpoint returns.
+    Returns (htf_highs, htf_lows, htf_closes), or None when the series
+    carries no timestamps to align on.
+    """
+    if not times or len(times) != len(closes):
+        return None
+    start = None
+    for i, t in enumerate(times[:ratio]):
+        if t % htf_seconds == 0:
+            start = i
+            break
+    if start is None:
+        return None
+    idx = np.arange(start, len(closes), ratio)
+    htf_highs = np.maximum.reduceat(np.asarray(highs, dtype=np.float64), idx)
+    htf_lows = np.minimum.reduceat(np.asarray(lows, dtype=np.float64), idx)
+    close_idx = np.minimum(idx + ratio - 1, len(closes) - 1)
+    htf_closes = np.asarray(closes, dtype=np.float64)[close_idx]
+    return htf_highs, htf_lows, htf_closes
+
+
 # ── Per-Client Session Store ──────────────────────────────────
-# Each session: { thread, running, queue, config, data }
+# Each session: { thread, running, events, config, data, indicator_state }
+# "events" is a bounded deque guarded by a Condition: producers append and
+# notify, the SSE generator waits and drains. When a slow client falls
+# behind, the deque drops the *oldest* events so the stream stays current,
+# rather than silently losing the newest state.
 sessions = {}
 sessions_lock = threading.Lock()
 
+# Session idle lifetime. Expiry candidates live in a min-heap keyed by
+# (last_active + TTL, session_id) with lazy deletion: touching a session
+# pushes a fresh entry, and the cleanup thread only pops the front instead
+# of walking every session under the global lock.
+SESSION_TTL = 1800
+_expiry_heap = []
+
+
+def touch_session(session, session_id):
+    """Record activity on a session and reschedule its expiry."""
+    session["last_active"] = time.time()
+    with sessions_lock:
+        heapq.heappush(_expiry_heap, (session["last_active"] + SESSION_TTL, session_id))
+
+
+def _dumps(obj):
+    """Serialize an SSE payload with orjson (C-speed; OPT_SERIALIZE_NUMPY
+    covers the np.float64 values the incremental state path produces).
+    Returns bytes — frames are assembled and yielded as bytes so Werkzeug
+    never re-encodes them."""
+    return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY)
+
 
 def get_session(session_id):
     """Get or create a session by ID."""
@@ -66,34 +210,57 @@ def get_session(session_id):
             sessions[session_id] = {
                 "thread": None,
                 "running": False,
-                "queue": queue.Queue(maxsize=500),
+                "events": {
+                    "buf": collections.deque(maxlen=500),
+                    "cond": threading.Condition(),
+                },
                 "config": None,
                 "data": {},
+                "indicator_state": {},
+                "htf_cache": {},
+                "stop_event": threading.Event(),
+                "last_active": time.time(),
+                "listeners": 0,
             }
+            heapq.heappush(_expiry_heap,
+                           (sessions[session_id]["last_active"] + SESSION_TTL, session_id))
         return sessions[session_id]
 
 
 def push_event(session_id, event_type, data):
-    """Push an SSE event to a specific client's queue."""
-    with sessions_lock:
-        session = sessions.get(session_id)
-        if not session:
-            return
-    try:
-        event_data = json.dumps({"type": event_type, "data": data})
-        session["queue"].put_nowait(event_data)
-    except queue.Full:
-        pass  # Drop events if queue is full
+    """Push an SSE event to a specific client's event buffer.
+    The sessions read is deliberately lock-free: dict.get is atomic under
+    the GIL, sessions are inserted once and never replaced in place, and a
+    racing cleanup at worst delivers to a buffer nobody will drain. The
+    global lock stays confined to create/delete.
+    """
+    session = sessions.get(session_id)
+    if not session:
+        return
+    # Nobody is streaming this session (tab closed): skip the serialization
+    # and buffering entirely. Status events still land so a reconnecting
+    # client immediately learns the running state.
+    if session["listeners"] == 0 and event_type != "status":
+        return
+    event_data = _dumps({"type": event_type, "data": data})
+    events = session["events"]
+    with events["cond"]:
+        events["buf"].append(event_data)
+        events["cond"].notify_all()
 
 
 # ── Screener Loop (runs per-client) ──────────────────────────
 def screener_loop(session_id):
     """Run analysis for a specific client session using their config."""
     session = get_session(session_id)
+    session["stop_event"].clear()
 
     push_event(session_id, "status", {"running": True})
     push_event(session_id, "log", {"message": "Screener started.", "level": "success"})
 
+    config_id = None  # identity of the config the derived values below came from
+    idle_cycles = 0   # cycles completed with no SSE listener attached
+
     while session["running"]:
         config = session.get("config")
         if not config:
@@ -103,90 +270,167 @@ def screener_loop(session_id):
             })
             break
 
-        # Read config values
-        assets           = config.get("Assets", [])
-        timeframe_mins   = config.get("Timeframe", 15)
-        rsi_period       = config.get("RSI_Period", 14)
-        rsi_overbought   = config.get("RSI_Overbought", 70)
-        rsi_oversold     = config.get("RSI_Oversold", 30)
-
-        stoch_k_period   = config.get("Stoch_K_Period", 14)
-        stoch_k_smooth   = config.get("Stoch_K_Smooth", 3)
-        stoch_d_smooth   = config.get("Stoch_D_Smooth", 3)
-        stoch_overbought = config.get("Stoch_Overbought", 80)
-        stoch_oversold   = config.get("Stoch_Oversold", 20)
-        stoch_alert_method = config.get("Stoch_Alert_Method", 1)
-
-        ema_long_period  = config.get("EMA_Long_Period", 200)
-        ema_short_period = config.get("EMA_Short_Period", 21)
-        ema_proximity_atr_ratio = config.get("EMA_Proximity_ATR_Ratio", 0.5)
-        atr_period       = config.get("ATR_Period", 14)
-
-        lr_config = {
-            "length": config.get("LR_Length", 200),
-            "atr_length": config.get("LR_ATR_Length", 14),
-            "r2_threshold": config.get("LR_R2_Threshold", 0.3),
-            "slope_threshold": config.get("LR_Slope_Threshold", 0.5),
-            "sideways_slope_threshold": config.get("LR_Sideways_Slope_Threshold", 0.2),
-            "volatility_ma_length": config.get("LR_Volatility_MA_Length", 20),
-        }
-        lr_higher_tf = config.get("LR_Higher_Timeframe", 240)
-        lr_higher_interval_str = get_interval_str(lr_higher_tf)
-
-        interval_str = get_interval_str(timeframe_mins)
+        # Config-derived values only rebuild when the config object itself
+        # was replaced (via /api/start); steady-state cycles reuse them.
+        if id(config) != config_id:
+            config_id = id(config)
+
+            # Read config values
+            assets           = config.get("Assets", [])
+            timeframe_mins   = config.get("Timeframe", 15)
+            rsi_period       = config.get("RSI_Period", 14)
+            rsi_overbought   = config.get("RSI_Overbought", 70)
+            rsi_oversold     = config.get("RSI_Oversold", 30)
+
+            stoch_k_period   = config.get("Stoch_K_Period", 14)
+            stoch_k_smooth   = config.get("Stoch_K_Smooth", 3)
+            stoch_d_smooth   = config.get("Stoch_D_Smooth", 3)
+            stoch_overbought = config.get("Stoch_Overbought", 80)
+            stoch_oversold   = config.get("Stoch_Oversold", 20)
+            stoch_alert_method = config.get("Stoch_Alert_Method", 1)
+
+            ema_long_period  = config.get("EMA_Long_Period", 200)
+            ema_short_period = config.get("EMA_Short_Period", 21)
+            ema_proximity_atr_ratio = config.get("EMA_Proximity_ATR_Ratio", 0.5)
+            atr_period       = config.get("ATR_Period", 14)
+
+            lr_config = {
+                "length": config.get("LR_Length", 200),
+                "atr_length": config.get("LR_ATR_Length", 14),
+                "r2_threshold": config.get("LR_R2_Threshold", 0.3),
+                "slope_threshold": config.get("LR_Slope_Threshold", 0.5),
+                "sideways_slope_threshold": config.get("LR_Sideways_Slope_Threshold", 0.2),
+                "volatility_ma_length": config.get("LR_Volatility_MA_Length", 20),
+            }
+            lr_higher_tf = config.get("LR_Higher_Timeframe", 240)
+            lr_higher_interval_str = get_interval_str(lr_higher_tf)
+            interval_str = get_interval_str(timeframe_mins)
+            tf_label = interval_str
+
+            # When HTF is an integer multiple of the base timeframe and a
+            # widened base fetch stays under the API's response cap, HTF bars
+            # are derived locally by downsampling instead of a second HTTP
+            # round-trip per symbol. The derived window is sized like the
+            # HTTP fallback's (length + 50) so both paths see the same
+            # history, and the base fetch never shrinks below the standard
+            # 250 bars the base-timeframe indicators rely on.
+            htf_ratio = (lr_higher_tf // timeframe_mins
+                         if lr_higher_tf % timeframe_mins == 0 else 0)
+            htf_bars_needed = lr_config["length"] + 50
+            htf_from_base = (lr_higher_tf != timeframe_mins and htf_ratio > 1
+                             and htf_ratio * htf_bars_needed <= 1500)
+            base_count = max(250, htf_ratio * htf_bars_needed) if htf_from_base else 250
+
+        # Which higher-timeframe bar this cycle falls in — HTF analysis only
+        # changes when this bucket rolls over
+        htf_bucket = int(time.time() // (lr_higher_tf * 60))
 
         results = {}
         refreshed_count = 0
 
+        # Fetch every symbol (plus its higher-timeframe window) through a
+        # bounded pool — the shared session throttle in the screener module
+        # keeps MEXC rate-limit compliance while the network waits overlap.
+        # Results are analyzed and pushed as each base fetch completes, so
+        # the dashboard still fills in symbol by symbol.
+        executor = ThreadPoolExecutor(max_workers=8)
+        futures = {}
+        htf_futures = {}
+        # One log for the whole batch — per-symbol chatter only on errors
+        push_event(session_id, "log", {
+            "message": f"Fetching {len(assets)} assets...",
+            "level": "info"
+        })
         for symbol in assets:
+            futures[executor.submit(cached_fetch, symbol, interval_str,
+                                    timeframe_mins * 60 * 0.9, base_count)] = symbol
+            if lr_higher_tf != timeframe_mins and not htf_from_base:
+                cached_htf = session["htf_cache"].get((symbol, lr_higher_interval_str))
+                if cached_htf is None or cached_htf[0] != htf_bucket:
+                    htf_futures[symbol] = executor.submit(
+                        cached_fetch, symbol, lr_higher_interval_str,
+                        lr_higher_tf * 60 * 0.9, lr_config["length"] + 50)
+
+        for future in as_completed(futures):
+            symbol = futures[future]
             if not session["running"]:
+                executor.shutdown(wait=False, cancel_futures=True)
                 return
 
-            push_event(session_id, "log", {
-                "message": f"Fetching data for {symbol}...",
-                "level": "info"
-            })
-
-            time.sleep(0.15)  # Rate limit
             try:
-                raw_data = fetch_kline_data(symbol, interval_str)
-                if raw_data:
-                    highs, lows, closes = parse_ohlc(raw_data)
-                    if closes:
-                        refreshed_count += 1
-                    else:
-                        push_event(session_id, "log", {
-                            "message": f"{symbol}: Failed to parse data.",
-                            "level": "error"
-                        })
-                else:
-                    push_event(session_id, "log", {
-                        "message": f"{symbol}: Failed to fetch data (empty response).",
-                        "level": "error"
-                    })
+                raw_data = future.result()
             except Exception as e:
                 push_event(session_id, "log", {
                     "message": f"{symbol} Fetch Error: {str(e)}",
                     "level": "error"
                 })
-                # Pause longer if we hit a block
-                time.sleep(2)
                 continue
 
-            if not closes:
+            if not raw_data:
+                push_event(session_id, "log", {
+                    "message": f"{symbol}: Failed to fetch data (empty response).",
+                    "level": "error"
+                })
                 continue
 
+            highs, lows, closes = parse_ohlc(raw_data)
+            if closes is None or len(closes) == 0:
+                push_event(session_id, "log", {
+                    "message": f"{symbol}: Failed to parse data.",
+                    "level": "error"
+                })
+                continue
+            refreshed_count += 1
+
             prices = closes
             h_data = highs
             l_data = lows
-            current_price = prices[-1] if prices else None
+            current_price = float(prices[-1]) if len(prices) else None
 
             result = {"symbol": symbol, "price": current_price, "alerts": []}
 
+            # ATR series shared with the LR block below
+            lr_atr_series = compute_atr_series(h_data, l_data, prices, lr_config["atr_length"])
+
+            # ── Smoothed indicators ──
+            # Advance the session's per-symbol recurrence state by the newly
+            # closed bars since the previous cycle (O(1) per bar) instead of
+            # recomputing full histories; a period or timeframe change or an
+            # unusable window reseeds from scratch. State is keyed by
+            # (symbol, interval) — like htf_cache — so bars from one
+            # timeframe are never spliced into another's recurrences. The
+            # forming bar is folded in via a copy of the state, same as the
+            # CLI screener.
+            periods = {"rsi": rsi_period, "ema_long": ema_long_period,
+                       "ema_short": ema_short_period, "atr": atr_period}
+            times = parse_times(raw_data)
+            entry = session["indicator_state"].get((symbol, interval_str))
+            advanced = (entry is not None
+                        and entry["state"]["periods"] == periods
+                        and advance_market_entry(entry, times, h_data, l_data, prices))
+            if not advanced:
+                state = seed_indicator_state(times, h_data, l_data, prices, periods) if times else None
+                if state is not None:
+                    entry = {"highs": h_data, "lows": l_data, "prices": prices, "state": state}
+                    session["indicator_state"][(symbol, interval_str)] = entry
+                else:
+                    entry = None
+
+            if entry is not None:
+                rsi, ema_long, ema_short, atr = state_display_values(
+                    entry["state"], float(h_data[-1]), float(l_data[-1]), float(prices[-1]))
+            else:
+                rsi = compute_rsi(prices, rsi_period)
+                ema_long = compute_ema(prices, ema_long_period)
+                ema_short = compute_ema(prices, ema_short_period)
+                if atr_period == lr_config["atr_length"] and len(lr_atr_series):
+                    atr = float(lr_atr_series[-1])
+                else:
+                    atr = compute_atr(h_data, l_data, prices, atr_period)
+
             # ── RSI ──
-            rsi = calculate_rsi(prices, rsi_period)
             if rsi is not None:
-                result["rsi"] = round(rsi, 2)
+                result["rsi"] = rsi
                 if rsi > rsi_overbought:
                     result["alerts"].append({"type": "RSI OVERBOUGHT", "level": "danger"})
                 elif rsi < rsi_oversold:
@@ -196,26 +440,23 @@ def screener_loop(session_id):
                 result["rsi_note"] = "Not enough data"
 
             # ── EMA Long ──
-            ema_long = calculate_ema(prices, ema_long_period)
             if ema_long is not None and current_price is not None:
-                result["ema_long"] = round(ema_long, 4)
+                result["ema_long"] = ema_long
                 result["ema_long_position"] = "ABOVE" if current_price > ema_long else "BELOW"
             else:
                 result["ema_long"] = None
                 result["ema_long_note"] = f"Not old enough for EMA({ema_long_period})"
 
             # ── EMA Short + ATR Proximity ──
-            ema_short = calculate_ema(prices, ema_short_period)
             if ema_short is not None and current_price is not None:
-                result["ema_short"] = round(ema_short, 4)
-                atr = calculate_atr(h_data, l_data, prices, atr_period)
+                result["ema_short"] = ema_short
                 distance = abs(current_price - ema_short)
                 pos = "above" if current_price > ema_short else "below"
 
                 if atr is not None and atr > 0:
                     atr_ratio = distance / atr
-                    result["atr"] = round(atr, 4)
-                    result["atr_ratio"] = round(atr_ratio, 2)
+                    result["atr"] = atr
+                    result["atr_ratio"] = atr_ratio
                     if atr_ratio <= ema_proximity_atr_ratio:
                         result["ema_proximity"] = f"Price is {pos} EMA({ema_short_period})"
                         result["alerts"].append({
@@ -230,14 +471,14 @@ def screener_loop(session_id):
                 result["ema_short_note"] = f"Not old enough for EMA({ema_short_period})"
 
             # ── Stochastic ──
-            if h_data and l_data:
-                stoch_k, stoch_d = calculate_stochastic(
+            if len(h_data) and len(l_data):
+                stoch_k, stoch_d = compute_stochastic(
                     h_data, l_data, prices,
                     stoch_k_period, stoch_k_smooth, stoch_d_smooth
                 )
                 if stoch_k is not None and stoch_d is not None:
-                    result["stoch_k"] = round(stoch_k, 2)
-                    result["stoch_d"] = round(stoch_d, 2)
+                    result["stoch_k"] = stoch_k
+                    result["stoch_d"] = stoch_d
 
                     is_ob = stoch_k > stoch_overbought or stoch_d > stoch_overbought
                     is_os = stoch_k < stoch_oversold or stoch_d < stoch_oversold
@@ -270,13 +511,12 @@ def screener_loop(session_id):
                     result["stoch_note"] = "Not enough data"
 
             # ── Linear Regression (Default TF) ──
-            lr_result = classify_trend(prices, h_data, l_data, lr_config)
+            lr_result = classify_trend(prices, h_data, l_data, lr_config, atr_series=lr_atr_series)
             if lr_result:
-                tf_label = get_interval_str(timeframe_mins)
                 result["lr_trend"] = lr_result["trend"]
-                result["lr_confidence"] = round(lr_result["confidence"], 4)
-                result["lr_r_squared"] = round(lr_result["r_squared"], 4)
-                result["lr_norm_slope"] = round(lr_result["normalized_slope"], 4)
+                result["lr_confidence"] = lr_result["confidence"]
+                result["lr_r_squared"] = lr_result["r_squared"]
+                result["lr_norm_slope"] = lr_result["normalized_slope"]
                 result["lr_volatility"] = lr_result["volatility_regime"]
                 result["lr_tf_label"] = tf_label
             else:
@@ -284,32 +524,59 @@ def screener_loop(session_id):
                 result["lr_note"] = "Not enough data"
 
             # ── Linear Regression (Higher TF) ──
+            # Reuse the previous result while this symbol is still inside the
+            # same HTF bar; only a bucket rollover refetches and re-runs the
+            # regression.
             if lr_higher_tf != timeframe_mins:
-                time.sleep(0.15)  # Rate limit
-                htf_raw = fetch_kline_data(symbol, lr_higher_interval_str, count=lr_config["length"] + 50)
-                if htf_raw:
-                    htf_highs, htf_lows, htf_closes = parse_ohlc(htf_raw)
-                    if htf_closes:
+                cache_key = (symbol, lr_higher_interval_str)
+                cached_htf = session["htf_cache"].get(cache_key)
+                if cached_htf is not None and cached_htf[0] == htf_bucket:
+                    result.update(cached_htf[1])
+                else:
+                    htf_highs = htf_lows = htf_closes = None
+                    if htf_from_base:
+                        derived = derive_htf_ohlc(times, h_data, l_data, prices,
+                                                  htf_ratio, lr_higher_tf * 60)
+                        if derived is not None:
+                            htf_highs, htf_lows, htf_closes = derived
+                    if htf_closes is None:
+                        # Either HTF isn't derivable from the base fetch or
+                        # the alignment failed — fall back to the endpoint
+                        fut = htf_futures.get(symbol)
+                        try:
+                            htf_raw = fut.result() if fut is not None else cached_fetch(
+                                symbol, lr_higher_interval_str,
+                                lr_higher_tf * 60 * 0.9, lr_config["length"] + 50)
+                        except Exception:
+                            htf_raw = None
+                        if htf_raw:
+                            htf_highs, htf_lows, htf_closes = parse_ohlc(htf_raw)
+                        else:
+                            result["lr_htf_trend"] = None
+                            result["lr_htf_note"] = "Failed to fetch"
+                    if htf_closes is not None and len(htf_closes):
                         lr_htf = classify_trend(htf_closes, htf_highs, htf_lows, lr_config)
                         if lr_htf:
-                            result["lr_htf_trend"] = lr_htf["trend"]
-                            result["lr_htf_confidence"] = round(lr_htf["confidence"], 4)
-                            result["lr_htf_r_squared"] = round(lr_htf["r_squared"], 4)
-                            result["lr_htf_volatility"] = lr_htf["volatility_regime"]
-                            result["lr_htf_label"] = lr_higher_interval_str
+                            htf_fields = {
+                                "lr_htf_trend": lr_htf["trend"],
+                                "lr_htf_confidence": lr_htf["confidence"],
+                                "lr_htf_r_squared": lr_htf["r_squared"],
+                                "lr_htf_volatility": lr_htf["volatility_regime"],
+                                "lr_htf_label": lr_higher_interval_str,
+                            }
+                            result.update(htf_fields)
+                            session["htf_cache"][cache_key] = (htf_bucket, htf_fields)
                         else:
                             result["lr_htf_trend"] = None
                             result["lr_htf_note"] = "Not enough data"
-                    else:
+                    elif "lr_htf_note" not in result:
                         result["lr_htf_trend"] = None
                         result["lr_htf_note"] = "Failed to parse"
-                else:
-                    result["lr_htf_trend"] = None
-                    result["lr_htf_note"] = "Failed to fetch"
 
             results[symbol] = result
             push_event(session_id, "asset_update", result)
 
+        executor.shutdown(wait=True)
         session["data"] = results
         push_event(session_id, "cycle_complete", {
             "count": refreshed_count,
@@ -317,18 +584,39 @@ def screener_loop(session_id):
             "timestamp": datetime.now().strftime("%H:%M:%S")
         })
 
+        # Orphaned screener (tab closed, never stopped): stop burning API
+        # calls after two cycles with nobody streaming. A reconnect before
+        # that resets the counter.
+        if session["listeners"] == 0:
+            idle_cycles += 1
+            if idle_cycles >= 2:
+                session["running"] = False
+                break
+        else:
+            idle_cycles = 0
+
         # ── Countdown ──
         now_ts = int(time.time())
         interval_seconds = timeframe_mins * 60
         next_interval = ((now_ts // interval_seconds) + 1) * interval_seconds
         sleep_seconds = next_interval - now_ts
 
-        for i in range(sleep_seconds, 0, -1):
+        # Wake only at the moments a countdown event actually fires (every
+        # 5s, then each of the final 10 seconds) instead of ticking every
+        # second; the stop event interrupts the wait instantly.
+        stop_event = session["stop_event"]
+        deadline = time.monotonic() + sleep_seconds
+        marks = [i for i in range(sleep_seconds, 0, -1) if i % 5 == 0 or i <= 10]
+        for i in marks:
+            delta = (deadline - i) - time.monotonic()
+            if delta > 0 and stop_event.wait(delta):
+                return
             if not session["running"]:
                 return
-            if i % 5 == 0 or i <= 10:
-                push_event(session_id, "countdown", {"seconds_left": i})
-            time.sleep(1)
+            push_event(session_id, "countdown", {"seconds_left": i})
+        remaining = deadline - time.monotonic()
+        if remaining > 0 and stop_event.wait(remaining):
+            return
 
         push_event(session_id, "log", {"message": "Checking for updates...", "level": "info"})
 
@@ -338,17 +626,29 @@ def screener_loop(session_id):
 
 # ── Cleanup stale sessions ────────────────────────────────────
 def cleanup_sessions():
-    """Remove sessions that haven't been active for 30+ minutes."""
+    """Remove sessions that haven't been active for 30+ minutes.
+    Only the expired front of the heap is inspected — O(expired) per sweep,
+    not O(sessions) — and entries invalidated by a later touch are skipped.
+    """
     while True:
         time.sleep(300)  # Check every 5 minutes
         now = time.time()
         with sessions_lock:
-            stale = [
-                sid for sid, s in sessions.items()
-                if not s["running"] and s.get("last_active", 0) < now - 1800
-            ]
-            for sid in stale:
+            while _expiry_heap and _expiry_heap[0][0] <= now:
+                _, sid = heapq.heappop(_expiry_heap)
+                s = sessions.get(sid)
+                if s is None:
+                    continue  # already removed via an older entry
+                if s["running"]:
+                    # A screener can stop without touching the session (e.g.
+                    # the no-listener auto-stop), so re-arm the heap — unlike
+                    # a touch, "running" guarantees no newer entry exists.
+                    heapq.heappush(_expiry_heap, (now + SESSION_TTL, sid))
+                    continue
+                if s.get("last_active", 0) + SESSION_TTL > now:
+                    continue  # re-touched; a newer heap entry covers it
                 del sessions[sid]
+        _sweep_kline_cache()
 
 
 cleanup_thread = threading.Thread(target=cleanup_sessions, daemon=True)
@@ -380,7 +680,7 @@ def start_screener():
         return jsonify({"error": "Missing session_id or config"}), 400
 
     session = get_session(session_id)
-    session["last_active"] = time.time()
+    touch_session(session, session_id)
 
     if session["running"]:
         return jsonify({"status": "already_running"})
@@ -406,7 +706,8 @@ def stop_screener():
 
     session = get_session(session_id)
     session["running"] = False
-    session["last_active"] = time.time()
+    session["stop_event"].set()
+    touch_session(session, session_id)
     return jsonify({"status": "stopped"})
 
 
@@ -420,9 +721,10 @@ def reset_screener():
 
     session = get_session(session_id)
     session["running"] = False
+    session["stop_event"].set()
     time.sleep(1.5)
     session["data"] = {}
-    session["last_active"] = time.time()
+    touch_session(session, session_id)
 
     push_event(session_id, "reset", {})
     push_event(session_id, "log", {"message": "Data reset complete.", "level": "warning"})
@@ -437,21 +739,33 @@ def stream():
         return Response("Missing session_id", status=400)
 
     session = get_session(session_id)
-    session["last_active"] = time.time()
+    touch_session(session, session_id)
 
     def event_stream():
-        q = session["queue"]
+        events = session["events"]
+        buf, cond = events["buf"], events["cond"]
+        session["listeners"] += 1
         try:
             while True:
-                try:
-                    data = q.get(timeout=25)
-                    yield f"data: {data}\n\n"
-                except queue.Empty:
-                    yield f"data: {json.dumps({'type': 'heartbeat', 'data': {}})}\n\n"
+                with cond:
+                    if not buf:
+                        cond.wait(timeout=25)
+                    items = list(buf)
+                    buf.clear()
+                if not items:
+                    yield b"data: " + _dumps({"type": "heartbeat", "data": {}}) + b"\n\n"
+                else:
+                    # One frame carrying a JSON array — a single write per
+                    # drain instead of a syscall per event
+                    yield b"data: [" + b",".join(items) + b"]\n\n"
         except GeneratorExit:
             pass
+        finally:
+            session["listeners"] -= 1
 
     resp = Response(event_stream(), mimetype='text/event-stream')
+    # Frames are pre-encoded bytes; hand them straight to the WSGI layer
+    resp.direct_passthrough = True
     resp.headers['Cache-Control'] = 'no-cache'
     resp.headers['X-Accel-Buffering'] = 'no'
     resp.headers['Connection'] = 'keep-alive'
@@ -459,8 +773,14 @@ def stream():
 
 
 if __name__ == '__main__':
+    from gevent.pywsgi import WSGIServer
+
     print("=" * 50)
     print("  MEXC RSI Screener — Web Dashboard")
     print("  Open http://localhost:5000 in your browser")
     print("=" * 50)
-    app.run(debug=False, host='127.0.0.1', port=5000, threaded=True)
+    # Greenlet-per-connection instead of thread-per-connection: with the
+    # stdlib monkey-patched, each SSE stream costs a coroutine stack rather
+    # than an 8MB OS thread, matching how gunicorn runs this app in
+    # production (gevent worker class).
+    WSGIServer(('127.0.0.1', 5000), app).serve_forever()